@@ -2,81 +2,91 @@ import numpy as np
 import matplotlib.pyplot as plt
 import time
 import threading
+import random
+from collections import deque
 
 # Simulation Parameters
 METRO_RADIUS = 3  # km
 LERT_SPEED = 25 / 3600  # km per second
 REQUESTS_PER_MINUTE = 100
 LERT_COUNT = 25
+RANDOM_SEED = None  # Set to an int for reproducible request streams
+REAL_TIME = True  # Pace the simulation at 1 simulated second per wall-clock second
+SIMULATION_DURATION = None  # Simulated seconds to run for (None = run forever)
 
-# Lert Class
-class Lert:
-    def __init__(self, id):
-        self.id = id
-        self.available = True
-        self.position = np.random.uniform(0, METRO_RADIUS)  # Random start location
-        self.traveling_to = None
-        self.pickup_distance = 0
-        self.drop_distance = 0
-        self.waiting_time = 0
+# Lert Fleet (one array per attribute, indexed by Lert id)
+class LertFleet:
+    def __init__(self, count):
+        self.count = count
+        self.available = np.ones(count, dtype=bool)
+        self.available_count = count
+        self.position = np.random.uniform(0, METRO_RADIUS, count)  # Random start locations
+        self.traveling_to = [None] * count
+        self.pickup_distance = np.zeros(count)
+        self.drop_distance = np.zeros(count)
+        self.waiting_time = np.zeros(count)
+
+    def assign_request(self, i, request):
+        self.traveling_to[i] = request
+        self.pickup_distance[i] = request['distance']
+        self.drop_distance[i] = request['distance']
+        self.available[i] = False
+        self.available_count -= 1
 
-    def assign_request(self, request):
-        self.traveling_to = request
-        self.pickup_distance = request['distance']
-        self.drop_distance = request['distance']
-        self.available = False
-    
     def move(self):
-        if not self.available:
-            if self.pickup_distance > 0:
-                self.pickup_distance -= LERT_SPEED
-            else:
-                self.drop_distance -= LERT_SPEED
+        busy = ~self.available
+        to_pickup = busy & (self.pickup_distance > 0)
+        self.pickup_distance[to_pickup] -= LERT_SPEED
+        self.drop_distance[busy & ~to_pickup] -= LERT_SPEED
 
-            if self.drop_distance <= 0:
-                self.available = True
-                self.traveling_to = None
+        finished = np.flatnonzero(busy & (self.drop_distance <= 0))
+        self.available[finished] = True
+        self.available_count += finished.size
+        for i in finished:
+            self.traveling_to[i] = None
 
 # Simulation Class
 class MetroSimulation:
     def __init__(self):
-        self.lerts = [Lert(i) for i in range(LERT_COUNT)]
-        self.requests = []
+        self.lerts = LertFleet(LERT_COUNT)
+        self.requests = deque()  # Pending requests, oldest first
         self.completed_requests = 0
         self.time = 0
+        self.rng = random.Random(RANDOM_SEED)  # Scalar draws are much cheaper here than via NumPy
 
     def generate_requests(self):
         for _ in range(REQUESTS_PER_MINUTE // 60):
-            distance = np.random.uniform(0, METRO_RADIUS)
-            direction = np.random.choice(["to_station", "from_station"])
+            distance = self.rng.uniform(0, METRO_RADIUS)
+            direction = "to_station" if self.rng.random() < 0.5 else "from_station"
             self.requests.append({
                 'distance': distance,
                 'direction': direction
             })
 
     def assign_requests(self):
-        for request in self.requests:
-            available_lert = next((lert for lert in self.lerts if lert.available), None)
-            if available_lert:
-                available_lert.assign_request(request)
-                self.requests.remove(request)
-                self.completed_requests += 1
+        available = np.flatnonzero(self.lerts.available)
+        for i in available[:len(self.requests)]:
+            self.lerts.assign_request(i, self.requests.popleft())
+            self.completed_requests += 1
     
     def update(self):
         self.time += 1
-        for lert in self.lerts:
-            lert.move()
+        self.lerts.move()
         self.generate_requests()
         self.assign_requests()
 
     def run_simulation(self):
-        while True:
+        start_wall_time = time.time()
+        while SIMULATION_DURATION is None or self.time < SIMULATION_DURATION:
             self.update()
             self.display_status()
-            time.sleep(1)
+            if REAL_TIME:
+                # Sleep until this tick is due on the wall clock, so time spent
+                # in update() doesn't make the simulation drift behind
+                time.sleep(max(0.0, start_wall_time + self.time - time.time()))
 
     def display_status(self):
-        available_count = sum([lert.available for lert in self.lerts])
+        available_count = self.lerts.available_count
         print(f"Time: {self.time}s | Available Lerts: {available_count} | Pending Requests: {len(self.requests)} | Completed: {self.completed_requests}")
 
 # Start Simulation
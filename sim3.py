@@ -2,7 +2,7 @@ import time
 import heapq
 import threading
 import numpy as np
-import random
+from collections import deque
 
 # ------------------------------
 #   PARAMETERS & CONFIGURATION
@@ -12,7 +12,10 @@ REQUEST_RATE = 100 / 60.0        # Requests per second (100 per minute -> ~1.67
 INITIAL_LERT_COUNT = 25          # How many Lerts to start with
 LERT_SPEED_KMH = 25.0            # Speed in km/h
 LERT_SPEED = LERT_SPEED_KMH / 3600.0  # Speed in km/s
+TRIP_TIME_PER_KM = 2.0 / LERT_SPEED   # Round-trip seconds per km of request distance
 POISSON_REQUESTS = True          # Use Poisson arrivals or uniform arrivals?
+SAMPLE_BATCH_SIZE = 4096         # Random draws generated per NumPy call
+DIRECTIONS = ('to_station', 'from_station')
 
 # For Poisson arrivals:
 # The time between arrivals in a Poisson process is exponentially distributed
@@ -28,36 +31,45 @@ class Request:
       - time: The time (simulation clock) the request was created
       - distance: Distance from the metro station (km)
       - direction: Either 'to_station' or 'from_station'
+      - trip_time: Round-trip time for this distance at the fleet speed
       - assigned: Whether a Lert has been assigned
       - wait_start: When the request first entered the queue
       - wait_end: When a Lert started service (pickup)
       - travel_time: Time the Lert actually spends traveling with the passenger
+      - lert: The Lert serving this request (set on assignment)
     """
-    def __init__(self, time, distance, direction):
+    __slots__ = ('time', 'distance', 'direction', 'trip_time', 'assigned',
+                 'wait_start', 'wait_end', 'travel_time', 'lert')
+
+    def __init__(self, time, distance, direction, trip_time):
         self.time = time
         self.distance = distance
         self.direction = direction
+        self.trip_time = trip_time
         
         self.assigned = False
         self.wait_start = time
         self.wait_end = None
         self.travel_time = None
+        self.lert = None
 
 class Lert:
     """
     Represents a Lert vehicle:
       - id: Unique identifier
-      - speed: km/s
       - status: 'idle' or 'busy'
       - next_free_time: When this Lert will become available
       - total_trips: How many trips completed
+      - removed: Set when the Lert is taken out of service (lazy deletion)
     """
-    def __init__(self, id, speed):
+    __slots__ = ('id', 'status', 'next_free_time', 'total_trips', 'removed')
+
+    def __init__(self, id):
         self.id = id
-        self.speed = speed
         self.status = 'idle'
         self.next_free_time = 0.0
         self.total_trips = 0
+        self.removed = False
 
     def assign(self, current_time, request):
         """
@@ -66,20 +78,9 @@ class Lert:
           2. Travel to/from station (distance again)
         """
         self.status = 'busy'
-        pickup_distance = request.distance  # Distance from Lert to passenger
-        # For a simplified model, assume Lert is at the station or 'teleports' to passenger
-        # In a more advanced model, you'd track the Lert's position over time.
-
-        # Actually, let's assume Lert is currently at the station or idle location
-        # so time to reach passenger = distance / speed
-        travel_to_passenger_time = pickup_distance / self.speed
-
-        # Time to station or from station also = distance / speed
-        # If direction= 'to_station', then we go passenger->station
-        # If direction= 'from_station', station->passenger->home distance is the same
-        travel_with_passenger_time = pickup_distance / self.speed
-
-        total_travel_time = travel_to_passenger_time + travel_with_passenger_time
+        # The whole fleet shares one speed, so both legs together are
+        # distance * (2 / speed), already computed when the request was drawn.
+        total_travel_time = request.trip_time
 
         # The Lert will be free only after it completes the entire trip
         self.next_free_time = current_time + total_travel_time
@@ -88,6 +89,7 @@ class Lert:
         # Record the request's times
         request.wait_end = current_time  # The time the Lert started service
         request.travel_time = total_travel_time
+        request.lert = self  # So the completion event knows who to free
 
         return total_travel_time
 
@@ -100,14 +102,30 @@ class MetroSimulation:
         self.current_time = 0.0
         self.event_queue = []  # Priority queue for events (min-heap by event_time)
         
+        # Unassigned requests, oldest first (arrivals are appended in time order)
+        self.pending = deque()
+
         # Stats
-        self.requests = []
         self.completed_requests = 0
         self.total_wait_time = 0.0
         self.total_travel_time = 0.0
         
-        # Initialize Lerts
-        self.lerts = [Lert(i, LERT_SPEED) for i in range(INITIAL_LERT_COUNT)]
+        # Initialize Lerts, keyed by id so removal doesn't search a list
+        self.lerts = {i: Lert(i) for i in range(INITIAL_LERT_COUNT)}
+        self.next_lert_id = INITIAL_LERT_COUNT
+
+        # Idle Lerts as a min-heap of (next_free_time, lert_id, lert).
+        # Busy Lerts are not in here; their 'complete' event pushes them back.
+        self.idle_heap = []
+        for lert in self.lerts.values():
+            heapq.heappush(self.idle_heap, (lert.next_free_time, lert.id, lert))
+
+        # Pre-drawn random samples, served by index and refilled in batches
+        # so we don't pay NumPy's per-call overhead on every arrival.
+        # Gaps are unit-mean exponentials, scaled by the *current* rate on use.
+        self._exp_buf = np.random.exponential(1.0, SAMPLE_BATCH_SIZE).tolist()
+        self._exp_idx = 0
+        self.refill_arrival_samples()
 
         # Next arrival time
         self.schedule_next_request_arrival(self.current_time)
@@ -122,7 +140,11 @@ class MetroSimulation:
             # Exponential distribution for inter-arrival time
             rate = REQUEST_RATE  # requests per second
             mean_inter_arrival = 1.0 / rate  
-            gap = np.random.exponential(mean_inter_arrival)
+            if self._exp_idx >= SAMPLE_BATCH_SIZE:
+                self._exp_buf = np.random.exponential(1.0, SAMPLE_BATCH_SIZE).tolist()
+                self._exp_idx = 0
+            gap = self._exp_buf[self._exp_idx] * mean_inter_arrival
+            self._exp_idx += 1
         else:
             # Uniform or fixed approach: simply 1/rate
             gap = 1.0 / REQUEST_RATE
@@ -131,45 +153,63 @@ class MetroSimulation:
         # Push an "arrival event" into the queue
         heapq.heappush(self.event_queue, (next_arrival_time, 'arrival', None))
 
+    def refill_arrival_samples(self):
+        """
+        Draw the next batch of request distances and directions, and compute
+        every request's round-trip time in one vectorized multiply.
+        """
+        distances = np.random.uniform(0, METRO_RADIUS, SAMPLE_BATCH_SIZE)
+        self._unif_buf = distances.tolist()
+        self._trip_buf = (distances * TRIP_TIME_PER_KM).tolist()
+        self._dir_buf = np.random.randint(0, 2, SAMPLE_BATCH_SIZE).tolist()
+        self._arrival_idx = 0
+
     def handle_arrival_event(self):
         """
         Create a new Request. It can be 'to_station' or 'from_station' randomly.
-        Place it in the request list.
+        Place it at the back of the pending queue.
         """
-        direction = random.choice(['to_station', 'from_station'])
-        distance = np.random.uniform(0, METRO_RADIUS)
-        req = Request(self.current_time, distance, direction)
+        if self._arrival_idx >= SAMPLE_BATCH_SIZE:
+            self.refill_arrival_samples()
+        direction = DIRECTIONS[self._dir_buf[self._arrival_idx]]
+        distance = self._unif_buf[self._arrival_idx]
+        trip_time = self._trip_buf[self._arrival_idx]
+        self._arrival_idx += 1
+        req = Request(self.current_time, distance, direction, trip_time)
         
-        self.requests.append(req)
+        self.pending.append(req)
         
         # Schedule the next arrival
         self.schedule_next_request_arrival(self.current_time)
 
     def find_available_lert(self):
         """
-        Find a Lert that is idle at current_time (if any).
+        Pop a Lert that is idle at current_time off the idle heap (if any).
+        Lerts that were removed while idle are skipped and discarded.
         If none are idle, returns None.
         """
-        for lert in self.lerts:
-            if lert.next_free_time <= self.current_time:
+        while self.idle_heap:
+            next_free_time, _, lert = self.idle_heap[0]
+            if lert.removed:
+                heapq.heappop(self.idle_heap)
+                continue
+            if next_free_time <= self.current_time:
+                heapq.heappop(self.idle_heap)
                 return lert
+            return None
         return None
     
     def handle_requests(self):
         """
         Match available Lerts with waiting requests in FIFO or any queue discipline.
         """
-        # We'll do a simple FIFO approach
-        unassigned_requests = [r for r in self.requests if not r.assigned]
-        
-        # Sort unassigned requests by arrival time (FIFO)
-        unassigned_requests.sort(key=lambda r: r.time)
-        
-        for request in unassigned_requests:
+        # We'll do a simple FIFO approach: self.pending is already in arrival order
+        while self.pending:
             # Check if there is an idle Lert
             lert = self.find_available_lert()
             if lert is not None:
                 # Assign request
+                request = self.pending.popleft()
                 request.assigned = True
                 travel_time = lert.assign(self.current_time, request)
                 
@@ -184,8 +224,14 @@ class MetroSimulation:
     
     def handle_complete_event(self, request):
         """
-        When a request is completed, record stats.
+        When a request is completed, record stats and put the Lert back
+        on the idle heap.
         """
+        lert = request.lert
+        lert.status = 'idle'
+        if not lert.removed:
+            heapq.heappush(self.idle_heap, (self.current_time, lert.id, lert))
+
         self.completed_requests += 1
         wait_time = request.wait_end - request.wait_start
         self.total_wait_time += wait_time
@@ -193,28 +239,30 @@ class MetroSimulation:
 
     def run_step(self):
         """
-        Process the next event in the queue.
+        Process every event scheduled at the next event time.
         Then attempt to handle new requests with newly freed Lerts.
         """
         if not self.event_queue:
             # No more events scheduled, the simulation could end.
             return
 
-        # Pop the next event by chronological order
-        event_time, event_type, request = heapq.heappop(self.event_queue)
-        
-        # Advance simulation time
+        # Advance simulation time to the next event
+        event_time = self.event_queue[0][0]
         self.current_time = event_time
         
-        # Process this event
-        if event_type == 'arrival':
-            self.handle_arrival_event()
-        elif event_type == 'complete':
-            # A request is done
-            self.handle_complete_event(request)
-
-        # After processing an event, try to assign waiting requests
-        self.handle_requests()
+        # Process all events at this instant, in chronological (heap) order
+        while self.event_queue and self.event_queue[0][0] <= event_time:
+            _, event_type, request = heapq.heappop(self.event_queue)
+            if event_type == 'arrival':
+                self.handle_arrival_event()
+            elif event_type == 'complete':
+                # A request is done
+                self.handle_complete_event(request)
+
+        # After processing the batch, try to assign waiting requests once,
+        # but only if there is both a waiting request and an idle Lert
+        if self.pending and self.idle_heap and self.idle_heap[0][0] <= self.current_time:
+            self.handle_requests()
 
     def run_until(self, end_time):
         """
@@ -235,7 +283,7 @@ class MetroSimulation:
                     if self.completed_requests > 0 else 0.0)
         avg_travel = (self.total_travel_time / self.completed_requests 
                       if self.completed_requests > 0 else 0.0)
-        queue_length = sum(not r.assigned for r in self.requests)  # unassigned requests
+        queue_length = len(self.pending)  # unassigned requests
         return {
             'time': self.current_time,
             'completed_requests': self.completed_requests,
@@ -251,20 +299,24 @@ class MetroSimulation:
         """
         Dynamically add a new Lert to the simulation.
         """
-        new_id = len(self.lerts)
-        l = Lert(new_id, self.lerts[0].speed)  # use same speed or a new one
-        self.lerts.append(l)
+        new_id = self.next_lert_id
+        self.next_lert_id += 1
+        l = Lert(new_id)
+        l.next_free_time = self.current_time
+        self.lerts[new_id] = l
+        heapq.heappush(self.idle_heap, (l.next_free_time, l.id, l))
         print(f"Added new Lert #{new_id} at time {self.current_time:.2f}.")
 
     def remove_lert(self):
         """
         Dynamically remove an idle Lert from the simulation.
+        The Lert comes off the idle heap, so this is O(log N).
         If none is idle, do nothing or pick the first that will finish soon.
         """
-        idle_lerts = [l for l in self.lerts if l.next_free_time <= self.current_time]
-        if idle_lerts:
-            lert_to_remove = idle_lerts[0]
-            self.lerts.remove(lert_to_remove)
+        lert_to_remove = self.find_available_lert()
+        if lert_to_remove is not None:
+            lert_to_remove.removed = True
+            del self.lerts[lert_to_remove.id]
             print(f"Removed Lert #{lert_to_remove.id} at time {self.current_time:.2f}.")
         else:
             print("No idle Lert available to remove at this moment.")
@@ -281,11 +333,14 @@ class MetroSimulation:
         """
         Dynamically update the speed of all Lerts.
         """
-        global LERT_SPEED, LERT_SPEED_KMH
+        global LERT_SPEED, LERT_SPEED_KMH, TRIP_TIME_PER_KM
         LERT_SPEED_KMH = new_speed_kmh
         LERT_SPEED = LERT_SPEED_KMH / 3600.0
-        for l in self.lerts:
-            l.speed = LERT_SPEED
+        TRIP_TIME_PER_KM = 2.0 / LERT_SPEED
+        # Trip times are computed when requests are drawn; redo the unused ones
+        for req in self.pending:
+            req.trip_time = req.distance * TRIP_TIME_PER_KM
+        self._trip_buf = [d * TRIP_TIME_PER_KM for d in self._unif_buf]
         print(f"Lert speed set to {new_speed_kmh} km/h (i.e., {LERT_SPEED:.5f} km/s).")
 
 
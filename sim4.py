@@ -3,8 +3,9 @@ from tkinter import ttk
 import time
 import heapq
 import numpy as np
+from collections import deque
 import threading
-import random
+import queue
 
 # ------------------------------
 # SIMULATION PARAMETERS
@@ -14,85 +15,129 @@ REQUEST_RATE = 100 / 60.0
 INITIAL_LERT_COUNT = 25
 LERT_SPEED_KMH = 25.0
 LERT_SPEED = LERT_SPEED_KMH / 3600.0
+TRIP_TIME_PER_KM = 2.0 / LERT_SPEED
 POISSON_REQUESTS = True
+SAMPLE_BATCH_SIZE = 4096
+DIRECTIONS = ('to_station', 'from_station')
+SIM_TICK = 1.0  # Simulated seconds advanced per worker tick (one tick per real SIM_TICK seconds)
 
 # ------------------------------
 # CORE SIMULATION (Same as Before)
 # ------------------------------
 class Request:
-    def __init__(self, time, distance, direction):
+    __slots__ = ('time', 'distance', 'direction', 'trip_time', 'assigned',
+                 'wait_start', 'wait_end', 'travel_time', 'lert')
+
+    def __init__(self, time, distance, direction, trip_time):
         self.time = time
         self.distance = distance
         self.direction = direction
+        self.trip_time = trip_time
         self.assigned = False
         self.wait_start = time
         self.wait_end = None
         self.travel_time = None
+        self.lert = None
 
 class Lert:
-    def __init__(self, id, speed):
+    __slots__ = ('id', 'status', 'next_free_time', 'total_trips', 'removed')
+
+    def __init__(self, id):
         self.id = id
-        self.speed = speed
         self.status = 'idle'
         self.next_free_time = 0.0
         self.total_trips = 0
+        self.removed = False
 
     def assign(self, current_time, request):
-        pickup_distance = request.distance
-        travel_to_passenger_time = pickup_distance / self.speed
-        travel_with_passenger_time = pickup_distance / self.speed
-        total_travel_time = travel_to_passenger_time + travel_with_passenger_time
+        self.status = 'busy'
+        total_travel_time = request.trip_time
         self.next_free_time = current_time + total_travel_time
         self.total_trips += 1
         request.wait_end = current_time
         request.travel_time = total_travel_time
+        request.lert = self
         return total_travel_time
 
 class MetroSimulation:
     def __init__(self):
         self.current_time = 0.0
         self.event_queue = []
-        self.requests = []
+        self.pending = deque()
         self.completed_requests = 0
         self.total_wait_time = 0.0
         self.total_travel_time = 0.0
-        self.lerts = [Lert(i, LERT_SPEED) for i in range(INITIAL_LERT_COUNT)]
+        self.lerts = [Lert(i) for i in range(INITIAL_LERT_COUNT)]
+        self.next_lert_id = INITIAL_LERT_COUNT
+        # Min-heap of idle Lerts: (next_free_time, lert_id, lert)
+        self.idle_heap = []
+        for lert in self.lerts:
+            heapq.heappush(self.idle_heap, (lert.next_free_time, lert.id, lert))
+        # Batched random draws (unit-mean exponential gaps, distances, directions)
+        self._exp_buf = np.random.exponential(1.0, SAMPLE_BATCH_SIZE).tolist()
+        self._exp_idx = 0
+        self.refill_arrival_samples()
         self.schedule_next_request_arrival(self.current_time)
 
     def schedule_next_request_arrival(self, now):
         if POISSON_REQUESTS:
             rate = REQUEST_RATE
             mean_inter_arrival = 1.0 / rate
-            gap = np.random.exponential(mean_inter_arrival)
+            if self._exp_idx >= SAMPLE_BATCH_SIZE:
+                self._exp_buf = np.random.exponential(1.0, SAMPLE_BATCH_SIZE).tolist()
+                self._exp_idx = 0
+            gap = self._exp_buf[self._exp_idx] * mean_inter_arrival
+            self._exp_idx += 1
         else:
             gap = 1.0 / REQUEST_RATE
         next_arrival_time = now + gap
         heapq.heappush(self.event_queue, (next_arrival_time, 'arrival', None))
 
+    def refill_arrival_samples(self):
+        distances = np.random.uniform(0, METRO_RADIUS, SAMPLE_BATCH_SIZE)
+        self._unif_buf = distances.tolist()
+        self._trip_buf = (distances * TRIP_TIME_PER_KM).tolist()
+        self._dir_buf = np.random.randint(0, 2, SAMPLE_BATCH_SIZE).tolist()
+        self._arrival_idx = 0
+
     def handle_arrival_event(self):
-        direction = random.choice(['to_station', 'from_station'])
-        distance = np.random.uniform(0, METRO_RADIUS)
-        req = Request(self.current_time, distance, direction)
-        self.requests.append(req)
+        if self._arrival_idx >= SAMPLE_BATCH_SIZE:
+            self.refill_arrival_samples()
+        direction = DIRECTIONS[self._dir_buf[self._arrival_idx]]
+        distance = self._unif_buf[self._arrival_idx]
+        trip_time = self._trip_buf[self._arrival_idx]
+        self._arrival_idx += 1
+        req = Request(self.current_time, distance, direction, trip_time)
+        self.pending.append(req)
         self.schedule_next_request_arrival(self.current_time)
 
     def find_available_lert(self):
-        for lert in self.lerts:
-            if lert.next_free_time <= self.current_time:
+        while self.idle_heap:
+            next_free_time, _, lert = self.idle_heap[0]
+            if lert.removed:
+                heapq.heappop(self.idle_heap)
+                continue
+            if next_free_time <= self.current_time:
+                heapq.heappop(self.idle_heap)
                 return lert
+            return None
         return None
 
     def handle_requests(self):
-        unassigned_requests = [r for r in self.requests if not r.assigned]
-        unassigned_requests.sort(key=lambda r: r.time)
-        for request in unassigned_requests:
+        while self.pending:
             lert = self.find_available_lert()
-            if lert:
-                request.assigned = True
-                travel_time = lert.assign(self.current_time, request)
-                heapq.heappush(self.event_queue, (self.current_time + travel_time, 'complete', request))
+            if lert is None:
+                break
+            request = self.pending.popleft()
+            request.assigned = True
+            travel_time = lert.assign(self.current_time, request)
+            heapq.heappush(self.event_queue, (self.current_time + travel_time, 'complete', request))
 
     def handle_complete_event(self, request):
+        lert = request.lert
+        lert.status = 'idle'
+        if not lert.removed:
+            heapq.heappush(self.idle_heap, (self.current_time, lert.id, lert))
         self.completed_requests += 1
         wait_time = request.wait_end - request.wait_start
         self.total_wait_time += wait_time
@@ -101,13 +146,16 @@ class MetroSimulation:
     def run_step(self):
         if not self.event_queue:
             return
-        event_time, event_type, request = heapq.heappop(self.event_queue)
+        event_time = self.event_queue[0][0]
         self.current_time = event_time
-        if event_type == 'arrival':
-            self.handle_arrival_event()
-        elif event_type == 'complete':
-            self.handle_complete_event(request)
-        self.handle_requests()
+        while self.event_queue and self.event_queue[0][0] <= event_time:
+            _, event_type, request = heapq.heappop(self.event_queue)
+            if event_type == 'arrival':
+                self.handle_arrival_event()
+            elif event_type == 'complete':
+                self.handle_complete_event(request)
+        if self.pending and self.idle_heap and self.idle_heap[0][0] <= self.current_time:
+            self.handle_requests()
 
     def run_until(self, end_time):
         while self.event_queue and self.current_time < end_time:
@@ -116,7 +164,7 @@ class MetroSimulation:
     def get_stats(self):
         avg_wait = (self.total_wait_time / self.completed_requests if self.completed_requests > 0 else 0)
         avg_travel = (self.total_travel_time / self.completed_requests if self.completed_requests > 0 else 0)
-        queue_length = sum(not r.assigned for r in self.requests)
+        queue_length = len(self.pending)
         return {
             'time': self.current_time,
             'completed_requests': self.completed_requests,
@@ -125,6 +173,20 @@ class MetroSimulation:
             'queue_length': queue_length
         }
 
+    def add_lert(self):
+        lert = Lert(self.next_lert_id)
+        self.next_lert_id += 1
+        lert.next_free_time = self.current_time
+        self.lerts.append(lert)
+        heapq.heappush(self.idle_heap, (lert.next_free_time, lert.id, lert))
+
+    def remove_lert(self):
+        # Lazy deletion: the Lert stays in the idle heap (or finishes its
+        # current trip) and is skipped/dropped when it next surfaces.
+        if len(self.lerts) > 0:
+            lert = self.lerts.pop()
+            lert.removed = True
+
 # ------------------------------
 # GUI INTERFACE
 # ------------------------------
@@ -157,25 +219,47 @@ class MetroSimulationGUI:
         self.scale_rate.pack(pady=5)
         ttk.Label(root, text="Request Rate (per min)").pack()
 
+        # The simulation runs on a worker thread. The UI only reads the latest
+        # stats snapshot (swapped in whole by the worker) and sends Lert
+        # changes through a command queue, so only the worker touches the sim.
+        self._commands = queue.Queue()
+        self._stats_snapshot = self.simulation.get_stats()
+        self._worker = threading.Thread(target=self._sim_worker, daemon=True)
+        self._worker.start()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
         # Real-time updates
         self.update_display()
 
+    def _sim_worker(self):
+        while self.running:
+            try:
+                while True:
+                    self._commands.get_nowait()()
+            except queue.Empty:
+                pass
+            self.simulation.run_until(self.simulation.current_time + SIM_TICK)
+            self._stats_snapshot = self.simulation.get_stats()
+            time.sleep(SIM_TICK)
+
     def update_display(self):
-        stats = self.simulation.get_stats()
+        stats = self._stats_snapshot
         self.label_completed.config(text=f"Completed Requests: {stats['completed_requests']}")
         self.label_queue.config(text=f"Queue Length: {stats['queue_length']}")
         self.label_wait.config(text=f"Avg Wait Time: {stats['avg_wait_time']:.2f} s")
 
         if self.running:
-            self.simulation.run_until(self.simulation.current_time + 1)
             self.root.after(1000, self.update_display)
 
+    def on_close(self):
+        self.running = False
+        self.root.destroy()
+
     def add_lert(self):
-        self.simulation.lerts.append(Lert(len(self.simulation.lerts), LERT_SPEED))
+        self._commands.put(self.simulation.add_lert)
     
     def remove_lert(self):
-        if len(self.simulation.lerts) > 0:
-            self.simulation.lerts.pop()
+        self._commands.put(self.simulation.remove_lert)
     
     def change_rate(self, value):
         global REQUEST_RATE
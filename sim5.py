@@ -1,126 +1,155 @@
+import math
 import matplotlib.pyplot as plt
 import numpy as np
 import random
+from numba import njit
+from scipy.spatial.distance import cdist
 
 # Simulation parameters
 zone_radius = 10
 num_rickshaws = 5
 num_initial_requests = 10
 rickshaw_speed = 0.5
+render_every = 10  # Redraw the plot once every this many simulation steps
 
 # Central metro station coordinates
 metro_station = (0, 0)
 
+# Rickshaw status codes, and their plot colors
+FREE, TO_PICKUP, TO_DROPOFF = 0, 1, 2
+STATUS_COLORS = np.array(["g", "b", "r"])  # Green free, blue to pickup, red to dropoff
 
-# Helper function to generate random points inside a circle
-def random_point_in_circle(radius):
-    angle = random.uniform(0, 2 * np.pi)
-    r = radius * np.sqrt(random.uniform(0, 1))
-    return r * np.cos(angle), r * np.sin(angle)
 
+# Helper function to generate n random points inside a circle, as an (n, 2) array
+def random_points_in_circle(radius, n):
+    angle = np.random.uniform(0, 2 * np.pi, n)
+    r = radius * np.sqrt(np.random.uniform(0, 1, n))
+    return np.column_stack((r * np.cos(angle), r * np.sin(angle)))
 
-# Initialize rickshaws with random positions inside the circle
-rickshaws = [{"pos": random_point_in_circle(zone_radius), "status": "free", "target": None}
-             for _ in range(num_rickshaws)]
+
+# Endless stream of (x, y) points inside a circle, generated in batches
+def circle_point_stream(radius, batch_size=256):
+    while True:
+        yield from map(tuple, random_points_in_circle(radius, batch_size).tolist())
+
+
+# Initialize rickshaws with random positions inside the circle.
+# Rickshaw state is kept as one array per attribute, indexed by rickshaw.
+rickshaw_pos = random_points_in_circle(zone_radius, num_rickshaws)
+rickshaw_target = np.zeros((num_rickshaws, 2))   # Where the rickshaw is heading now
+rickshaw_dropoff = np.zeros((num_rickshaws, 2))  # Drop-off of the request being served
+rickshaw_status = np.full(num_rickshaws, FREE, dtype=np.int8)
 
 # Generate initial requests inside the circle
-requests = [{"pickup": random_point_in_circle(zone_radius), "dropoff": metro_station, "type": "to_metro"}
-            for _ in range(num_initial_requests)]
+requests = [{"pickup": pickup, "dropoff": metro_station, "type": "to_metro"}
+            for pickup in map(tuple, random_points_in_circle(zone_radius, num_initial_requests).tolist())]
+
+# Points for requests generated during the simulation
+request_points = circle_point_stream(zone_radius)
 
 
 # Function to generate new requests dynamically
 def generate_request():
     if random.random() < 0.5:  # Type 1: To Metro Station
-        pickup = random_point_in_circle(zone_radius)
+        pickup = next(request_points)
         dropoff = metro_station
         req_type = "to_metro"
     else:  # Type 2: From Metro Station
         pickup = metro_station
-        dropoff = random_point_in_circle(zone_radius)
+        dropoff = next(request_points)
         req_type = "from_metro"
     return {"pickup": pickup, "dropoff": dropoff, "type": req_type}
 
 
-# Function to calculate distance
-def distance(a, b):
-    return np.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2)
-
-
-# Function to move rickshaws towards their targets
-def move_towards(current, target, speed):
-    dist = distance(current, target)
-    if dist <= speed:
-        return target
-    else:
-        dx, dy = target[0] - current[0], target[1] - current[1]
-        scale = speed / dist
-        return current[0] + dx * scale, current[1] + dy * scale
-
-
-# Simulation loop
+# Compiled per-step kernel: move every busy rickshaw one step towards its
+# target and advance its status when the target is reached.
+@njit(cache=True)
+def step_rickshaws(pos, target, dropoff, status, speed):
+    for i in range(pos.shape[0]):
+        if status[i] == FREE:
+            continue
+        dx = target[i, 0] - pos[i, 0]
+        dy = target[i, 1] - pos[i, 1]
+        dist = math.sqrt(dx * dx + dy * dy)
+        if dist > speed:
+            scale = speed / dist
+            pos[i, 0] += dx * scale
+            pos[i, 1] += dy * scale
+            continue
+
+        # Target reached
+        pos[i, 0] = target[i, 0]
+        pos[i, 1] = target[i, 1]
+        if status[i] == TO_PICKUP:
+            status[i] = TO_DROPOFF
+            target[i, 0] = dropoff[i, 0]
+            target[i, 1] = dropoff[i, 1]
+        else:
+            status[i] = FREE
+
+
+# Static parts of the plot are drawn once; the loop only updates artist data
 plt.ion()
 fig, ax = plt.subplots(figsize=(8, 8))
+ax.set_xlim(-zone_radius - 1, zone_radius + 1)
+ax.set_ylim(-zone_radius - 1, zone_radius + 1)
+ax.add_artist(plt.Circle((0, 0), zone_radius, color="blue", fill=False, linestyle="--"))
+ax.plot(*metro_station, "bo", markersize=10, label="Metro Station")
+ax.legend(loc="upper left")
+
+request_scatter = ax.scatter([], [], s=64)   # Green to metro, yellow from metro
+rickshaw_scatter = ax.scatter([], [], s=36)  # Colored by status
+requests_text = ax.text(0.02, 0.98, "", transform=ax.transAxes, fontsize=12, verticalalignment='top')
+active_text = ax.text(0.02, 0.94, "", transform=ax.transAxes, fontsize=12, verticalalignment='top')
+free_text = ax.text(0.02, 0.90, "", transform=ax.transAxes, fontsize=12, verticalalignment='top')
+
+# Simulation loop
 
 for step in range(1000):  # Number of simulation steps
-    # Assign free rickshaws to requests
-    for rickshaw in rickshaws:
-        if rickshaw["status"] == "free" and requests:
-            nearest_request = min(requests, key=lambda req: distance(rickshaw["pos"], req["pickup"]))
-            rickshaw["status"] = "to_pickup"
-            rickshaw["target"] = nearest_request
-            requests.remove(nearest_request)
-
-    # Update rickshaw positions
-    for rickshaw in rickshaws:
-        if rickshaw["status"] in ["to_pickup", "to_dropoff"]:
-            target = rickshaw["target"]["pickup"] if rickshaw["status"] == "to_pickup" else rickshaw["target"][
-                "dropoff"]
-            rickshaw["pos"] = move_towards(rickshaw["pos"], target, rickshaw_speed)
-
-            # Check if target is reached
-            if rickshaw["pos"] == target:
-                if rickshaw["status"] == "to_pickup":
-                    rickshaw["status"] = "to_dropoff"
-                else:
-                    rickshaw["status"] = "free"
-                    rickshaw["target"] = None
+    # Assign free rickshaws to requests: each free rickshaw in turn takes the
+    # nearest request still pending, using one free x pending distance matrix
+    free = np.flatnonzero(rickshaw_status == FREE)
+    if free.size and requests:
+        pickups = np.array([req["pickup"] for req in requests])
+        dist = cdist(rickshaw_pos[free], pickups)
+        taken = set()
+        for row, i in enumerate(free[:len(requests)]):
+            j = int(dist[row].argmin())
+            dist[:, j] = np.inf
+            taken.add(j)
+            rickshaw_status[i] = TO_PICKUP
+            rickshaw_target[i] = requests[j]["pickup"]
+            rickshaw_dropoff[i] = requests[j]["dropoff"]
+        requests = [req for j, req in enumerate(requests) if j not in taken]
+
+    # Update rickshaw positions and statuses
+    step_rickshaws(rickshaw_pos, rickshaw_target, rickshaw_dropoff, rickshaw_status, rickshaw_speed)
 
     # Generate new requests dynamically
     if random.random() < 0.2:  # 20% chance to generate a new request at each step
         requests.append(generate_request())
 
     # Visualization
-    ax.clear()
-    ax.set_xlim(-zone_radius - 1, zone_radius + 1)
-    ax.set_ylim(-zone_radius - 1, zone_radius + 1)
-    ax.add_artist(plt.Circle((0, 0), zone_radius, color="blue", fill=False, linestyle="--"))
-
-    # Plot metro station
-    ax.plot(*metro_station, "bo", markersize=10, label="Metro Station")
+    if (step + 1) % render_every:
+        continue
 
     # Plot requests
-    for req in requests:
-        ax.plot(*req["pickup"], "go" if req["type"] == "to_metro" else "yo", markersize=8)
+    request_scatter.set_offsets(np.array([req["pickup"] for req in requests]).reshape(-1, 2))
+    request_scatter.set_color(["g" if req["type"] == "to_metro" else "y" for req in requests])
 
     # Plot rickshaws with different colors based on status
-    for rickshaw in rickshaws:
-        if rickshaw["status"] == "free":
-            ax.plot(*rickshaw["pos"], "go", markersize=6)  # Green for free
-        elif rickshaw["status"] == "to_pickup":
-            ax.plot(*rickshaw["pos"], "bo", markersize=6)  # Blue for en route to pickup
-        elif rickshaw["status"] == "to_dropoff":
-            ax.plot(*rickshaw["pos"], "ro", markersize=6)  # Red for en route to dropoff
+    rickshaw_scatter.set_offsets(rickshaw_pos)
+    rickshaw_scatter.set_color(STATUS_COLORS[rickshaw_status])
 
     # Display stats
-    num_free = sum(1 for rickshaw in rickshaws if rickshaw["status"] == "free")
-    num_active = sum(1 for rickshaw in rickshaws if rickshaw["status"] != "free")
+    num_free = np.count_nonzero(rickshaw_status == FREE)
+    num_active = num_rickshaws - num_free
     num_requests = len(requests)
 
-    ax.text(0.02, 0.98, f"Requests: {num_requests}", transform=ax.transAxes, fontsize=12, verticalalignment='top')
-    ax.text(0.02, 0.94, f"Active Rickshaws: {num_active}", transform=ax.transAxes, fontsize=12, verticalalignment='top')
-    ax.text(0.02, 0.90, f"Free Rickshaws: {num_free}", transform=ax.transAxes, fontsize=12, verticalalignment='top')
+    requests_text.set_text(f"Requests: {num_requests}")
+    active_text.set_text(f"Active Rickshaws: {num_active}")
+    free_text.set_text(f"Free Rickshaws: {num_free}")
 
-    ax.legend(loc="upper left")
     ax.set_title(f"Step {step + 1}")
     plt.pause(0.1)
 
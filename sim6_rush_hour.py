@@ -1,6 +1,10 @@
+import os
+from math import gamma as gamma_fn
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import gamma
+
+SHOW_PLOT = os.environ.get("SHOW_PLOT", "1") != "0"  # SHOW_PLOT=0 skips plotting (e.g. batch runs)
+
+rng = np.random.Generator(np.random.PCG64DXSM())
 
 # Parameters for the two gamma distributions (morning and evening peaks)
 k1, theta1 = 4, 0.5  # Morning peak (sharp)
@@ -10,34 +14,64 @@ k3, theta3 = 3, 2    # Base level distribution for hours 0 to 8
 # Mixing proportions
 p1, p2, p3 = 0.4, 0.4, 0.2  # Lower weight for early morning
 
-# Generate x values (time of day in hours)
-x = np.linspace(0, 24, 1000)
+# (shape, scale, start hour) of each mixture component
+components = [(k1, theta1, 8), (k2, theta2, 16), (k3, theta3, 0)]
+
+# Gamma PDF written out directly (scipy.stats.gamma.pdf without the dispatch
+# overhead). Negative t is clipped to 0, which gives 0 density for shape > 1.
+def gamma_pdf(t, k, theta):
+    t = np.maximum(t, 0)
+    return t ** (k - 1) * np.exp(-t / theta) / (gamma_fn(k) * theta**k)
 
-# Calculate the bi-modal gamma distribution
-pdf1 = gamma.pdf(x - 8, k1, scale=theta1)  # Morning peak at 8 to 10
-pdf2 = gamma.pdf(x - 16, k2, scale=theta2)  # Evening peak at 16 to 19
-pdf3 = gamma.pdf(x, k3, scale=theta3)       # Base level for early hours
 
-# Combine the three gamma distributions
-pdf_combined = p1 * pdf1 + p2 * pdf2 + p3 * pdf3
-pdf_combined /= np.trapz(pdf_combined, x)  # Normalize to make it a valid distribution
+# Draw arrival times straight from the mixture: pick a component, then a gamma sample
+def sample_hours(n):
+    comp = rng.choice(len(components), size=n, p=[p1, p2, p3])
+    samples = np.empty(n)
+    for c, (k, theta, start) in enumerate(components):
+        mask = comp == c
+        samples[mask] = rng.gamma(k, theta, np.count_nonzero(mask)) + start
+    return samples
+
 
 # Simulate the number of people per hour
 total_people = 30000
-hourly_people = np.histogram(np.random.choice(x, total_people, p=pdf_combined / pdf_combined.sum()), bins=24, range=(0, 24))[0]
-
-# Print the number of people per hour
-for hour in range(24):
-    print(f"Hour {hour}: {hourly_people[hour]} people")
-
-# Plotting
-plt.figure(figsize=(12, 7))
-plt.plot(x, pdf_combined, label="Bi-modal Gamma Distribution (Rush Hour)")
-plt.bar(np.arange(24), hourly_people, width=0.8, alpha=0.5, label="Simulated Hourly People")
-plt.xlabel("Time of Day (Hours)")
-plt.ylabel("Passenger Flow / Hour")
-plt.title("Delhi Metro Rush Hour Simulation (30,000 People)")
-plt.xticks(np.arange(0, 25, 1))
-plt.legend()
-plt.grid(True)
-plt.show()
+samples = sample_hours(total_people)
+# The day ends at 24h: redraw anything past it (the plotted PDF is truncated the same way)
+late = samples >= 24
+while late.any():
+    samples[late] = sample_hours(np.count_nonzero(late))
+    late = samples >= 24
+hourly_people = np.bincount(samples.astype(int), minlength=24)
+
+# Print the number of people per hour (one write for all 24 lines)
+print("\n".join(f"Hour {hour}: {count} people" for hour, count in enumerate(hourly_people.tolist())))
+
+# Plotting (matplotlib is only imported when plotting)
+if SHOW_PLOT:
+    import matplotlib.pyplot as plt
+
+    # Generate x values (time of day in hours), only used for plotting the PDF
+    x = np.linspace(0, 24, 200)
+
+    # Calculate the bi-modal gamma distribution
+    pdf1 = gamma_pdf(x - 8, k1, theta1)  # Morning peak at 8 to 10
+    pdf2 = gamma_pdf(x - 16, k2, theta2)  # Evening peak at 16 to 19
+    pdf3 = gamma_pdf(x, k3, theta3)       # Base level for early hours
+
+    # Combine the three gamma distributions
+    pdf_combined = p1 * pdf1 + p2 * pdf2 + p3 * pdf3
+    # Normalize to make it a valid distribution (trapezoid rule on the uniform grid)
+    dx = x[1] - x[0]
+    pdf_combined /= dx * (pdf_combined.sum() - 0.5 * (pdf_combined[0] + pdf_combined[-1]))
+
+    plt.figure(figsize=(12, 7))
+    plt.plot(x, pdf_combined, label="Bi-modal Gamma Distribution (Rush Hour)")
+    plt.stairs(hourly_people, edges=np.arange(25), fill=True, alpha=0.5, label="Simulated Hourly People")
+    plt.xlabel("Time of Day (Hours)")
+    plt.ylabel("Passenger Flow / Hour")
+    plt.title("Delhi Metro Rush Hour Simulation (30,000 People)")
+    plt.xticks(np.arange(0, 25, 1))
+    plt.legend()
+    plt.grid(True)
+    plt.show()
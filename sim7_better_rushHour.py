@@ -1,49 +1,72 @@
+import os
+from math import erf, exp, pi, sqrt
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import gamma, norm
 
-# Generate x values (time of day in hours)
-x = np.linspace(0, 24, 1000)
+SHOW_PLOT = os.environ.get("SHOW_PLOT", "1") != "0"  # SHOW_PLOT=0 skips plotting (e.g. batch runs)
 
-# Model parameters for different phases of the day
-morning_peak = norm.pdf(x, 9, 0.8)  # Sharp peak at 9 AM
-midday_decline = norm.pdf(x, 11, 1.5)  # Gradual decline after 11 AM
+rng = np.random.Generator(np.random.PCG64DXSM())
 
-afternoon_rise = norm.pdf(x, 16, 1.2)  # Gradual rise around 4 PM
-evening_drop = norm.pdf(x, 19, 0.9)  # Steep drop after 7 PM
+# Model parameters for different phases of the day: (weight, mean hour, std dev)
+morning_peak = (1.5, 9, 0.8)  # Sharp peak at 9 AM
+midday_decline = (0.8, 11, 1.5)  # Gradual decline after 11 AM
 
-night_low = gamma.pdf(x, 2, scale=3) * 0.1  # Low distribution from 1 AM to 4 AM
+afternoon_rise = (1.2, 16, 1.2)  # Gradual rise around 4 PM
+evening_drop = (1.3, 19, 0.9)  # Steep drop after 7 PM
 
-# Combine the distributions with appropriate weights
-pdf_combined = (
-    1.5 * morning_peak +
-    0.8 * midday_decline +
-    1.2 * afternoon_rise +
-    1.3 * evening_drop +
-    night_low
-)
+night_low = (0.1, 3)  # (weight, scale) of a shape-2 gamma: low distribution from 1 AM to 4 AM
 
-pdf_combined /= np.trapz(pdf_combined, x)  # Normalize the combined distribution
 
-# Simulate the number of people per hour
+# Mixture CDF in closed form: each normal phase contributes weight * Phi(z)
+# and the shape-2 gamma contributes weight * (1 - exp(-t/scale) * (1 + t/scale)).
+# Only 25 hour edges are evaluated, so plain Python is fast enough.
+def mixture_cdf(t, phases, night_weight, night_scale):
+    return [
+        night_weight * (1.0 - exp(-ti / night_scale) * (1.0 + ti / night_scale))
+        + sum(weight * 0.5 * (1.0 + erf((ti - mu) / (sigma * sqrt(2.0)))) for weight, mu, sigma in phases)
+        for ti in t
+    ]
+
+
+# Build the combined PDF on the plot grid. The normal and gamma PDFs are
+# written out directly and the result is normalized by its trapezoid
+# integral on the uniform grid.
+def build_pdf(x, phases, night_weight, night_scale):
+    pdf = night_weight / night_scale**2 * x * np.exp(-x / night_scale)
+    for weight, mu, sigma in phases:
+        pdf += weight / (sigma * sqrt(2 * pi)) * np.exp(-0.5 * ((x - mu) / sigma) ** 2)
+    pdf /= (x[1] - x[0]) * (pdf.sum() - 0.5 * (pdf[0] + pdf[-1]))
+    return pdf
+
+
+phases = [morning_peak, midday_decline, afternoon_rise, evening_drop]
+
+# Probability of each hour: exact mixture mass between consecutive hour edges,
+# divided by the mass on [0, 24] (the end-to-end CDF difference, so no extra sum)
+cdf_edges = np.array(mixture_cdf(range(25), phases, *night_low))
+p_hour = np.diff(cdf_edges) / (cdf_edges[-1] - cdf_edges[0])
+
+# Simulate the number of people per hour: one multinomial draw gives all 24 counts
 total_people = 30000
-hourly_people = np.histogram(
-    np.random.choice(x, total_people, p=pdf_combined / pdf_combined.sum()),
-    bins=24, range=(0, 24)
-)[0]
-
-# Print the number of people per hour
-for hour in range(24):
-    print(f"Hour {hour}: {hourly_people[hour]} people")
-
-# Plotting
-plt.figure(figsize=(12, 7))
-plt.plot(x, pdf_combined, label="Simulated Traffic Model (Rush Hour)")
-plt.bar(np.arange(24), hourly_people, width=0.8, alpha=0.5, label="Simulated Hourly People")
-plt.xlabel("Time of Day (Hours)")
-plt.ylabel("Passenger Flow / Hour")
-plt.title("Delhi Metro Traffic Simulation (30,000 People)")
-plt.xticks(np.arange(0, 25, 1))
-plt.legend()
-plt.grid(True)
-plt.show()
+hourly_people = rng.multinomial(total_people, p_hour)
+
+# Print the number of people per hour (one write for all 24 lines)
+print("\n".join(f"Hour {hour}: {count} people" for hour, count in enumerate(hourly_people.tolist())))
+
+# Plotting (matplotlib is only imported when plotting)
+if SHOW_PLOT:
+    import matplotlib.pyplot as plt
+
+    # Generate x values (time of day in hours), only used for plotting the PDF
+    x = np.linspace(0, 24, 1000)
+    pdf_combined = build_pdf(x, phases, *night_low)
+
+    plt.figure(figsize=(12, 7))
+    plt.plot(x, pdf_combined, label="Simulated Traffic Model (Rush Hour)")
+    plt.stairs(hourly_people, edges=np.arange(25), fill=True, alpha=0.5, label="Simulated Hourly People")
+    plt.xlabel("Time of Day (Hours)")
+    plt.ylabel("Passenger Flow / Hour")
+    plt.title("Delhi Metro Traffic Simulation (30,000 People)")
+    plt.xticks(np.arange(0, 25, 1))
+    plt.legend()
+    plt.grid(True)
+    plt.show()